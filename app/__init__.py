@@ -1,48 +1,145 @@
 import os
-from flask import Flask, send_from_directory
-from flask_cors import CORS
+from flask import Flask, abort, current_app, g, has_request_context, request, send_from_directory
+from flask_caching import Cache
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 from .config import UPLOAD_FOLDER, ALLOWED_EXTENSIONS
 
 # Load environment variables from .env file
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
-
-# Upload route
-@app.route('/uploads/<filename>')
-def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
-
-# Database configuration - Now using Neon PostgreSQL
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or \
-    'sqlite:///nduwa_sheepmanager.db'  # Fallback to SQLite if no DATABASE_URL
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-
-# Initialize extensions
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
-
-# Import and register routes
-from . import routes
-from .lamb_routes import lamb_bp   # ✅ Import lamb blueprint
-app.register_blueprint(lamb_bp)    # ✅ Register lamb routes (no prefix)
-
-# Optional: Add a health check endpoint
-@app.route('/health')
-def health_check():
-    return {'status': 'healthy', 'database': app.config['SQLALCHEMY_DATABASE_URI']}
-
-# 🔧 Temporary route to run migrations manually
-@app.route('/run-migrations')
-def run_migrations():
-    from flask_migrate import upgrade
-    try:
-        upgrade()
-        return {'status': 'success', 'message': 'Database migrated successfully'}
-    except Exception as e:
-        return {'status': 'error', 'message': str(e)}
+# Bound to the app in create_app()
+db = SQLAlchemy()
+cache = Cache()
+
+
+def allowed_file(filename):
+    _, dot, ext = filename.rpartition('.')
+    return dot == '.' and ext.lower() in ALLOWED_EXTENSIONS
+
+
+def create_app():
+    # Deferred so importing the package stays cheap until an app is built
+    from flask_compress import Compress
+    from flask_cors import CORS
+    from flask_migrate import Migrate
+
+    from .json_provider import ORJSONProvider
+
+    app = Flask(__name__)
+    app.json = ORJSONProvider(app)
+    CORS(app)
+
+    # Database configuration - Now using Neon PostgreSQL
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or \
+        'sqlite:///nduwa_sheepmanager.db'  # Fallback to SQLite if no DATABASE_URL
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if database_url.get_backend_name() != 'sqlite':
+        # Keep warm connections between requests; pre_ping validates a pooled
+        # connection before use (Neon drops idle ones), recycle retires them early
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_recycle': 1800,
+            'pool_timeout': 30,
+            'pool_pre_ping': True,
+        }
+    elif database_url.database not in (None, '', ':memory:'):
+        # SQLite file (dev/test): connections are cheap, nothing to pool.
+        # In-memory databases keep Flask-SQLAlchemy's StaticPool.
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': NullPool}
+    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    app.config['SERVE_UPLOADS'] = os.environ.get('SERVE_UPLOADS', '1').lower() in ('1', 'true')
+    # Behind a web server that honours X-Sendfile, let it stream uploads
+    # instead of pushing the bytes through the WSGI worker
+    app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true')
+    app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000  # one year
+    # Compress JSON responses; tiny payloads are not worth the CPU
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    # Read cache: only with a shared Redis (REDIS_URL). A per-process cache
+    # would keep serving records other workers have since changed.
+    if os.environ.get('REDIS_URL'):
+        app.config['CACHE_TYPE'] = 'RedisCache'
+        app.config['CACHE_REDIS_URL'] = os.environ['REDIS_URL']
+    else:
+        app.config['CACHE_TYPE'] = 'NullCache'
+    app.config['CACHE_KEY_PREFIX'] = 'nduwa_'
+
+    # Initialize extensions
+    db.init_app(app)
+    Migrate(app, db)
+    Compress(app)
+    cache.init_app(app)
+
+    # Dev/test only: fail requests that show an N+1 lazy-load pattern
+    app.config['RAISE_ON_N_PLUS_ONE'] = os.environ.get('RAISE_ON_N_PLUS_ONE', '').lower() in ('1', 'true')
+    if app.config['RAISE_ON_N_PLUS_ONE']:
+        _raise_on_n_plus_one()
+
+    # Upload route - only for legacy local files; new images are uploaded
+    # straight to Cloudinary by the client and stored as image_url
+    if app.config['SERVE_UPLOADS']:
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+        @app.route('/uploads/<filename>')
+        def uploaded_file(filename):
+            # Only images are ever stored here; refuse anything else early
+            if not allowed_file(filename):
+                abort(404)
+            resp = send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+            # Nothing rewrites files in the upload folder, so a name always
+            # refers to the same bytes
+            resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+            return resp
+
+    # Import and register routes
+    from .routes import sheep_bp
+    from .lamb_routes import lamb_bp
+    app.register_blueprint(sheep_bp)
+    app.register_blueprint(lamb_bp)    # ✅ Register lamb routes (no prefix)
+
+    # Optional: Add a health check endpoint
+    @app.route('/health')
+    def health_check():
+        return {'status': 'healthy', 'database': app.config['SQLALCHEMY_DATABASE_URI']}
+
+    # 🔧 Temporary route to run migrations manually
+    @app.route('/run-migrations')
+    def run_migrations():
+        from flask_migrate import upgrade
+        try:
+            upgrade()
+            return {'status': 'success', 'message': 'Database migrated successfully'}
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+
+    return app
+
+
+def _raise_on_n_plus_one():
+    """Raise when a request lazy-loads the same relationship more than once"""
+    # db.session's listeners are shared by every app, so register only once;
+    # _check_lazy_load itself honours each app's RAISE_ON_N_PLUS_ONE
+    if not event.contains(db.session, 'do_orm_execute', _check_lazy_load):
+        event.listen(db.session, 'do_orm_execute', _check_lazy_load)
+
+
+def _check_lazy_load(orm_execute_state):
+    # lazy_loaded_from raises on UPDATE/DELETE statements, so check is_select first
+    if (not orm_execute_state.is_select or orm_execute_state.lazy_loaded_from is None
+            or not has_request_context()):
+        return
+    if not current_app.config.get('RAISE_ON_N_PLUS_ONE'):
+        return
+    relationship = orm_execute_state.loader_strategy_path[-1]
+    seen = g.setdefault('lazy_loaded_relationships', set())
+    if relationship in seen:
+        raise RuntimeError(
+            f"N+1 query: {relationship} lazy-loaded repeatedly in {request.method} {request.path}"
+        )
+    seen.add(relationship)
@@ -1,60 +1,96 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime
-from . import db
-from .models import Sheep  # Lamb model not used here since lambs are stored in Sheep with is_lamb=True
+from flask import Blueprint, current_app, request, jsonify
+from datetime import date
+from . import cache, db
+from .models import Sheep  # lambs are stored in Sheep with is_lamb=True
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
+from sqlalchemy import func, or_
+from sqlalchemy.orm import aliased, joinedload, selectinload
 
 lamb_bp = Blueprint('lambs', __name__)
 
-def resolve_parent_id(tag_id):
-    """Case-insensitive parent resolution with debug logging"""
-    if not tag_id:
-        return None
+_REQUIRED_FIELDS = ('tag_id', 'gender', 'dob')
+_STRING_FIELDS = _REQUIRED_FIELDS + ('mother_id', 'father_id')
 
-    tag_id = tag_id.strip()
-    all_tags = [t[0] for t in Sheep.query.with_entities(Sheep.tag_id).all()]
-    print(f"\n[DEBUG] All tag_ids in DB: {all_tags}")
-    print(f"[DEBUG] Resolving parent with tag_id: '{tag_id}'")
+def jload():
+    """Request payload: JSON body (via the app's orjson provider) or form data"""
+    return request.get_json() if request.is_json else request.form
 
-    parent = Sheep.query.filter(func.lower(Sheep.tag_id) == func.lower(tag_id)).first()
-    if parent:
-        print(f"[DEBUG] Parent found: ID={parent.id}, tag_id={parent.tag_id}")
-    else:
-        print(f"[DEBUG] Parent with tag_id '{tag_id}' not found")
+def fetch_parent_ids(tag_ids):
+    """lower(tag_id) -> id for every parent among tag_ids, in a single query"""
+    wanted = {t.strip().lower() for t in tag_ids if t}
+    if not wanted:
+        return {}
+    return dict(
+        Sheep.query.with_entities(func.lower(Sheep.tag_id), Sheep.id)
+        .filter(func.lower(Sheep.tag_id).in_(wanted))
+        .all()
+    )
 
-    return parent.id if parent else None
+def parent_id(parent_ids, tag_id):
+    return parent_ids.get(tag_id.strip().lower()) if tag_id else None
+
+def resolve_parent_ids(mother_tag, father_tag):
+    """Case-insensitive mother/father resolution in at most one query"""
+    parent_ids = fetch_parent_ids((mother_tag, father_tag))
+    return parent_id(parent_ids, mother_tag), parent_id(parent_ids, father_tag)
 
 @lamb_bp.route('/lambs', methods=['GET'])
 def get_all_lambs():
-    lambs = Sheep.query.filter_by(is_lamb=True).all()
+    # Plain column rows with parent tags joined in: no ORM objects to hydrate
+    mother = aliased(Sheep)
+    father = aliased(Sheep)
+    rows = (
+        db.session.query(
+            Sheep.id, Sheep.tag_id, Sheep.dob, Sheep.gender, Sheep.image,
+            mother.tag_id.label('mother_tag'), father.tag_id.label('father_tag'),
+            Sheep.weight, Sheep.weaning_weight, Sheep.breed, Sheep.medical_records
+        )
+        .outerjoin(mother, Sheep.mother_id == mother.id)
+        .outerjoin(father, Sheep.father_id == father.id)
+        .filter(Sheep.is_lamb == True)
+        .all()
+    )
+
     return jsonify([{
-        'id': lamb.id,
-        'tag_id': lamb.tag_id,
-        'dob': lamb.dob.isoformat() if lamb.dob else None,
-        'gender': lamb.gender,
-        'image_url': lamb.image if lamb.image else None,
-        'mother_id': lamb.mother.tag_id if lamb.mother else None,
-        'father_id': lamb.father.tag_id if lamb.father else None,
-        'weight': lamb.weight,
-        'weaning_weight': lamb.weaning_weight,
-        'breed': lamb.breed,
-        'notes': lamb.medical_records
-    } for lamb in lambs])
+        'id': row.id,
+        'tag_id': row.tag_id,
+        'dob': row.dob,
+        'gender': row.gender,
+        'image_url': row.image if row.image else None,
+        'mother_id': row.mother_tag,
+        'father_id': row.father_tag,
+        'weight': row.weight,
+        'weaning_weight': row.weaning_weight,
+        'breed': row.breed,
+        'notes': row.medical_records
+    } for row in rows])
 
 @lamb_bp.route('/lambs/<int:lamb_id>', methods=['GET'])
 def get_lamb_by_id(lamb_id):
-    lamb = Sheep.query.get_or_404(lamb_id)
+    # Lamb and both parents in one round trip
+    lamb = Sheep.query.options(
+        joinedload(Sheep.mother), joinedload(Sheep.father)
+    ).get_or_404(lamb_id)
     if not lamb.is_lamb:
         return jsonify({'error': 'Not a lamb'}), 400
-        
+
+    # Siblings share a mother or a father; fetch only their tag_ids
+    parent_filters = []
+    if lamb.mother_id:
+        parent_filters.append(Sheep.mother_id == lamb.mother_id)
+    if lamb.father_id:
+        parent_filters.append(Sheep.father_id == lamb.father_id)
+    siblings = [s[0] for s in Sheep.query.with_entities(Sheep.tag_id).filter(
+        Sheep.id != lamb.id, or_(*parent_filters)
+    ).all()] if parent_filters else []
+
     return jsonify({
         'tag_id': lamb.tag_id,
         'dob': lamb.dob.isoformat() if lamb.dob else None,
         'family': {
             'mother': lamb.mother.tag_id if lamb.mother else None,
             'father': lamb.father.tag_id if lamb.father else None,
-            'siblings': [sib.tag_id for sib in lamb.mother_children + lamb.father_children if sib.id != lamb.id]
+            'siblings': siblings
         },
         'medical_records': lamb.medical_records,
         'image_url': lamb.image if lamb.image else None,
@@ -65,24 +101,20 @@ def get_lamb_by_id(lamb_id):
 
 @lamb_bp.route('/lambs', methods=['POST'])
 def add_lamb():
-    print(f"\n=== NEW LAMB REQUEST ===")
-    print(f"Content-Type: {request.content_type}")
-    print(f"Data: {request.get_json() if request.is_json else request.form}")
+    data = jload()
 
-    data = request.get_json() if request.is_json else request.form
+    current_app.logger.debug("New lamb request (%s): %s", request.content_type, data)
 
-    required = ['tag_id', 'gender', 'dob']
-    missing = [field for field in required if field not in data or not data.get(field)]
+    missing = [field for field in _REQUIRED_FIELDS if not data.get(field)]
     if missing:
         return jsonify({"error": f"Missing required fields: {missing}"}), 400
 
     try:
-        dob = datetime.strptime(data['dob'], "%Y-%m-%d").date()
+        dob = date.fromisoformat(data['dob'])
     except ValueError:
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
 
-    mother_id = resolve_parent_id(data.get("mother_id"))
-    father_id = resolve_parent_id(data.get("father_id"))
+    mother_id, father_id = resolve_parent_ids(data.get("mother_id"), data.get("father_id"))
 
     try:
         new_lamb = Sheep(
@@ -100,6 +132,7 @@ def add_lamb():
         )
         db.session.add(new_lamb)
         db.session.commit()
+        cache.clear()
 
         return jsonify({
             "message": "Lamb added successfully",
@@ -123,17 +156,83 @@ def add_lamb():
         db.session.rollback()
         return jsonify({"error": "Tag ID already exists"}), 400
     except Exception as e:
-        print(f"\n[ERROR] Unexpected error: {str(e)}")
+        current_app.logger.error("Unexpected error adding lamb: %s", e)
         return jsonify({"error": "Internal server error"}), 500
 
+@lamb_bp.route('/lambs/bulk', methods=['POST'])
+def add_lambs_bulk():
+    records = jload()
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "Expected a non-empty JSON array of lambs"}), 400
+
+    dobs = []
+    for index, data in enumerate(records):
+        if not isinstance(data, dict):
+            return jsonify({"error": f"Lamb #{index}: expected an object"}), 400
+        missing = [field for field in _REQUIRED_FIELDS if not data.get(field)]
+        if missing:
+            return jsonify({"error": f"Lamb #{index}: Missing required fields: {missing}"}), 400
+        not_strings = [field for field in _STRING_FIELDS
+                       if data.get(field) is not None and not isinstance(data[field], str)]
+        if not_strings:
+            return jsonify({"error": f"Lamb #{index}: Fields must be strings: {not_strings}"}), 400
+        try:
+            dobs.append(date.fromisoformat(data['dob']))
+        except ValueError:
+            return jsonify({"error": f"Lamb #{index}: Invalid date format. Use YYYY-MM-DD"}), 400
+
+    tag_ids = [data["tag_id"].strip() for data in records]
+    seen, duplicates = set(), []
+    for tag_id in tag_ids:
+        if tag_id.lower() in seen:
+            duplicates.append(tag_id)
+        seen.add(tag_id.lower())
+    if duplicates:
+        return jsonify({"error": "Duplicate tag IDs in request", "tag_ids": duplicates}), 400
+
+    # One query for all parents referenced anywhere in the batch
+    parent_ids = fetch_parent_ids(
+        tag for data in records for tag in (data.get("mother_id"), data.get("father_id"))
+    )
+
+    try:
+        mappings = [{
+            "tag_id": tag_id,
+            "dob": dob,
+            "gender": data["gender"],
+            "weight": float(data['weight']) if data.get('weight') else None,
+            "weaning_weight": float(data['weaning_weight']) if data.get('weaning_weight') else None,
+            "breed": data.get("breed"),
+            "medical_records": data.get("medical_records", ""),
+            "image": data.get("image_url"),
+            "mother_id": parent_id(parent_ids, data.get("mother_id")),
+            "father_id": parent_id(parent_ids, data.get("father_id")),
+            "is_lamb": True
+        } for data, tag_id, dob in zip(records, tag_ids, dobs)]
+    except (TypeError, ValueError):
+        return jsonify({"error": "weight and weaning_weight must be numbers"}), 400
+
+    try:
+        db.session.bulk_insert_mappings(Sheep, mappings)
+        db.session.commit()
+        cache.clear()
+    except IntegrityError:
+        db.session.rollback()
+        existing = [t[0] for t in Sheep.query.with_entities(Sheep.tag_id).filter(
+            func.lower(Sheep.tag_id).in_([t.lower() for t in tag_ids])
+        ).all()]
+        return jsonify({"error": "Tag ID already exists", "tag_ids": existing}), 400
+
+    return jsonify({"message": f"{len(mappings)} lambs added successfully", "count": len(mappings)}), 201
+
 @lamb_bp.route('/lambs/<int:lamb_id>', methods=['PUT'])
 def update_lamb(lamb_id):
     lamb = Sheep.query.get_or_404(lamb_id)
     if not lamb.is_lamb:
         return jsonify({"error": "Not a lamb"}), 400
 
-    data = request.get_json() if request.is_json else request.form
-    print("Incoming lamb update:", data)
+    data = jload()
+    current_app.logger.debug("Incoming lamb update: %s", data)
 
     lamb.tag_id = data.get('tag_id', lamb.tag_id)
     lamb.weight = float(data['weight']) if 'weight' in data else lamb.weight
@@ -142,18 +241,18 @@ def update_lamb(lamb_id):
 
     if 'dob' in data:
         try:
-            lamb.dob = datetime.strptime(data['dob'], "%Y-%m-%d").date()
+            lamb.dob = date.fromisoformat(data['dob'])
         except ValueError:
-            print("Invalid date format for DOB")
+            current_app.logger.debug("Invalid date format for DOB: %s", data['dob'])
+
+    mother_id, father_id = resolve_parent_ids(data.get('mother_id'), data.get('father_id'))
 
     if 'mother_id' in data:
-        mother_id = resolve_parent_id(data['mother_id'])
         if mother_id is None:
             return jsonify({"error": f"Mother sheep with tag_id '{data['mother_id']}' not found"}), 404
         lamb.mother_id = mother_id
 
     if 'father_id' in data:
-        father_id = resolve_parent_id(data['father_id'])
         if father_id is None:
             return jsonify({"error": f"Father sheep with tag_id '{data['father_id']}' not found"}), 404
         lamb.father_id = father_id
@@ -162,7 +261,9 @@ def update_lamb(lamb_id):
         lamb.image = data['image_url']
 
     db.session.commit()
-    print(f"Lamb updated: {lamb.tag_id}, mother_id={lamb.mother_id}, father_id={lamb.father_id}")
+    cache.clear()
+    current_app.logger.debug("Lamb updated: %s, mother_id=%s, father_id=%s",
+                             lamb.tag_id, lamb.mother_id, lamb.father_id)
     return jsonify({"message": "Lamb updated"})
 
 @lamb_bp.route('/lambs/<int:lamb_id>', methods=['DELETE'])
@@ -173,6 +274,7 @@ def delete_lamb(lamb_id):
 
     db.session.delete(lamb)
     db.session.commit()
+    cache.clear()
     return jsonify({"message": f"Lamb {lamb.tag_id} deleted"})
 
 @lamb_bp.route('/lambs/by-parent/<string:parent_tag_id>', methods=['GET'])
@@ -181,7 +283,9 @@ def get_lambs_by_parent(parent_tag_id):
     if not parent:
         return jsonify({"error": "Parent sheep not found"}), 404
 
-    lambs = Sheep.query.filter(
+    lambs = Sheep.query.options(
+        selectinload(Sheep.mother), selectinload(Sheep.father)
+    ).filter(
         Sheep.is_lamb == True,
         ((Sheep.mother_id == parent.id) | (Sheep.father_id == parent.id))
     ).all()
@@ -189,7 +293,7 @@ def get_lambs_by_parent(parent_tag_id):
     return jsonify([{
         'id': lamb.id,
         'tag_id': lamb.tag_id,
-        'dob': lamb.dob.isoformat() if lamb.dob else None,
+        'dob': lamb.dob,
         'gender': lamb.gender,
         'image_url': lamb.image if lamb.image else None,
         'weight': lamb.weight,
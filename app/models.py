@@ -1,6 +1,6 @@
 from . import db
 from sqlalchemy.orm import relationship
-from datetime import datetime, date
+from datetime import date, datetime
 
 class Sheep(db.Model):
     __tablename__ = 'sheep'
@@ -16,10 +16,12 @@ class Sheep(db.Model):
     breed = db.Column(db.String(50))
     is_lamb = db.Column(db.Boolean, default=False)
     weaning_weight = db.Column(db.Float, nullable=True)  # <-- Added this line
+    # Bumped on every write; GET /sheep derives its ETag from it
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Parent relationships (using sheep.id as foreign key)
-    mother_id = db.Column(db.Integer, db.ForeignKey('sheep.id'), nullable=True)
-    father_id = db.Column(db.Integer, db.ForeignKey('sheep.id'), nullable=True)
+    mother_id = db.Column(db.Integer, db.ForeignKey('sheep.id'), nullable=True, index=True)
+    father_id = db.Column(db.Integer, db.ForeignKey('sheep.id'), nullable=True, index=True)
 
     # Relationships
     mother = relationship(
@@ -33,6 +35,17 @@ class Sheep(db.Model):
         backref='father_children'
     )
 
+    __table_args__ = (
+        # Parent lookups match tag_id case-insensitively
+        db.Index('ix_sheep_lower_tag_id', db.func.lower(tag_id), unique=True),
+        # Lamb listings only ever filter on is_lamb = true
+        db.Index(
+            'ix_sheep_is_lamb', is_lamb,
+            postgresql_where=db.text('is_lamb = true'),
+            sqlite_where=db.text('is_lamb = 1')
+        ),
+    )
+
     @property
     def age(self):
         """Calculated age in years based on dob"""
@@ -45,34 +58,3 @@ class Sheep(db.Model):
 
     def __repr__(self):
         return f"<Sheep {self.tag_id}>"
-
-class Lamb(db.Model):
-    __tablename__ = 'lambs'
-
-    id = db.Column(db.Integer, primary_key=True)
-    tag_id = db.Column(db.String(50), unique=True, nullable=False)
-    dob = db.Column(db.Date, nullable=False)  # Lamb's own date of birth
-    gender = db.Column(db.String(10), nullable=False)
-    date_added = db.Column(db.DateTime, default=datetime.utcnow)
-    notes = db.Column(db.Text)
-    image = db.Column(db.String(200))
-    
-    weaning_weight = db.Column(db.Float)
-
-    # Parent relationships (using sheep.tag_id for easy reference)
-    mother_tag_id = db.Column(db.String(50), db.ForeignKey('sheep.tag_id'))
-    father_tag_id = db.Column(db.String(50), db.ForeignKey('sheep.tag_id'))
-
-    # Relationships
-    mother = relationship('Sheep', foreign_keys=[mother_tag_id], backref='lambs_by_mother')
-    father = relationship('Sheep', foreign_keys=[father_tag_id], backref='lambs_by_father')
-
-    @property
-    def age_days(self):
-        """Age in days (useful for lambs)"""
-        if self.dob:
-            return (date.today() - self.dob).days
-        return None
-
-    def __repr__(self):
-        return f"<Lamb {self.tag_id}>"
@@ -1,42 +1,72 @@
-from flask import request, jsonify
-from datetime import datetime
+import hashlib
+from flask import Blueprint, abort, current_app, make_response, request, jsonify
+from datetime import date
 from dateutil.parser import parse as parse_date  # NEW
-from . import app, db
-from .models import Sheep, Lamb
+from . import cache, db
+from .models import Sheep
+from sqlalchemy import BigInteger, cast, delete, func, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, joinedload, selectinload
+
+sheep_bp = Blueprint('sheep', __name__)
+
+_REQUIRED_FIELDS = ('tag_id', 'gender', 'dob')
+_STRING_FIELDS = _REQUIRED_FIELDS + ('mother_id', 'father_id')
 
 # ────────────────────────────────────────────────────────────
-def get_parent_id(tag_id):
-    if not tag_id:
-        return None
-    parent = Sheep.query.filter_by(tag_id=tag_id).first()
-    if not parent:
-        raise ValueError(f"Parent sheep with tag_id '{tag_id}' not found")
-    return parent.id
+def parse_dob(value):
+    """ISO dates take the fast C parser; other formats fall back to dateutil"""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return parse_date(value).date()
+
+def resolve_parent_tags(tag_ids):
+    """Map parent tag_ids to sheep ids with a single query"""
+    tags = list(dict.fromkeys(t for t in tag_ids if t))
+    if not tags:
+        return {}
+    found = dict(
+        Sheep.query.with_entities(Sheep.tag_id, Sheep.id)
+        .filter(Sheep.tag_id.in_(tags))
+        .all()
+    )
+    for tag_id in tags:
+        if tag_id not in found:
+            raise ValueError(f"Parent sheep with tag_id '{tag_id}' not found")
+    return found
+
+def resolve_parents(mother_tag, father_tag):
+    """Resolve mother/father tag_ids to sheep ids with a single query"""
+    found = resolve_parent_tags((mother_tag, father_tag))
+    return found.get(mother_tag), found.get(father_tag)
+
+def epoch_ms(column):
+    """Integer milliseconds since the epoch for a DateTime column"""
+    if db.engine.dialect.name == 'sqlite':
+        return cast((func.julianday(column) - 2440587.5) * 86400000, BigInteger)
+    return cast(func.extract('epoch', column) * 1000, BigInteger)
 
 # ────────────────────────────────────────────────────────────
-@app.route('/sheep', methods=['POST'], strict_slashes=False)
+@sheep_bp.route('/sheep', methods=['POST'], strict_slashes=False)
 def add_sheep():
-    print("📝 Received POST /sheep request")
     if not request.is_json:
         return jsonify({"error": "Content-Type must be application/json"}), 415
 
     data = request.get_json()
-    print("📥 Incoming data:", data)
+    current_app.logger.debug("POST /sheep data: %s", data)
 
-    required_fields = ['tag_id', 'gender', 'dob']
-    missing = [field for field in required_fields if not data.get(field)]
+    missing = [field for field in _REQUIRED_FIELDS if not data.get(field)]
     if missing:
         return jsonify({"error": f"Missing required fields: {missing}"}), 400
 
     try:
-        dob = parse_date(data['dob']).date()  # UPDATED
+        dob = parse_dob(data['dob'])
     except ValueError:
         return jsonify({"error": "Invalid date format"}), 400
 
     try:
-        mother_id = get_parent_id(data.get("mother_id")) if data.get("mother_id") else None
-        father_id = get_parent_id(data.get("father_id")) if data.get("father_id") else None
+        mother_id, father_id = resolve_parents(data.get("mother_id"), data.get("father_id"))
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
 
@@ -59,7 +89,8 @@ def add_sheep():
 
         db.session.add(new_sheep)
         db.session.commit()
-        print(f"✅ Added new sheep with tag_id: {new_sheep.tag_id}")
+        cache.clear()
+        current_app.logger.debug("Added new sheep with tag_id: %s", new_sheep.tag_id)
 
         return jsonify({
             "message": "Sheep added successfully",
@@ -78,28 +109,151 @@ def add_sheep():
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 # ────────────────────────────────────────────────────────────
-@app.route('/sheep', methods=['GET'])
+@sheep_bp.route('/sheep/bulk', methods=['POST'])
+def add_sheep_bulk():
+    if not request.is_json:
+        return jsonify({"error": "Content-Type must be application/json"}), 415
+
+    records = request.get_json()
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "Expected a non-empty JSON array of sheep"}), 400
+
+    dobs = []
+    for index, data in enumerate(records):
+        if not isinstance(data, dict):
+            return jsonify({"error": f"Sheep #{index}: expected an object"}), 400
+        missing = [field for field in _REQUIRED_FIELDS if not data.get(field)]
+        if missing:
+            return jsonify({"error": f"Sheep #{index}: Missing required fields: {missing}"}), 400
+        not_strings = [field for field in _STRING_FIELDS
+                       if data.get(field) is not None and not isinstance(data[field], str)]
+        if not_strings:
+            return jsonify({"error": f"Sheep #{index}: Fields must be strings: {not_strings}"}), 400
+        try:
+            dobs.append(parse_dob(data['dob']))
+        except ValueError:
+            return jsonify({"error": f"Sheep #{index}: Invalid date format"}), 400
+
+    tag_ids = [data["tag_id"] for data in records]
+    seen, duplicates = set(), []
+    for tag_id in tag_ids:
+        if tag_id.lower() in seen:
+            duplicates.append(tag_id)
+        seen.add(tag_id.lower())
+    if duplicates:
+        return jsonify({"error": "Duplicate tag IDs in request", "tag_ids": duplicates}), 400
+
+    # One query for all parents referenced anywhere in the batch
+    try:
+        parents = resolve_parent_tags(
+            tag for data in records for tag in (data.get("mother_id"), data.get("father_id"))
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+
+    try:
+        mappings = [{
+            "tag_id": data["tag_id"],
+            "dob": dob,
+            "gender": data["gender"],
+            "pregnant": bool(data.get("pregnant")) if data["gender"].lower() == "female" else None,
+            "medical_records": data.get("medical_records", ""),
+            "image": data.get("image_url"),
+            "weight": float(data['weight']) if data.get('weight') else None,
+            "breed": data.get("breed"),
+            "mother_id": parents.get(data.get("mother_id")),
+            "father_id": parents.get(data.get("father_id")),
+            "is_lamb": bool(data.get("is_lamb", False))
+        } for data, dob in zip(records, dobs)]
+    except (TypeError, ValueError):
+        return jsonify({"error": "weight must be a number"}), 400
+
+    try:
+        db.session.bulk_insert_mappings(Sheep, mappings)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        existing = [t[0] for t in Sheep.query.with_entities(Sheep.tag_id).filter(
+            func.lower(Sheep.tag_id).in_([t.lower() for t in tag_ids])
+        ).all()]
+        return jsonify({"error": "Tag ID already exists", "tag_ids": existing}), 409
+
+    cache.clear()
+    return jsonify({"message": f"{len(mappings)} sheep added successfully", "count": len(mappings)}), 201
+
+# ────────────────────────────────────────────────────────────
+@sheep_bp.route('/sheep', methods=['GET'])
 def get_sheep():
-    sheep_list = Sheep.query.all()
-    return jsonify([{
-        'id': sheep.id,
-        'tag_id': sheep.tag_id,
-        'dob': sheep.dob.isoformat() if sheep.dob else None,
-        'gender': sheep.gender,
-        'pregnant': sheep.pregnant,
-        'medical_records': sheep.medical_records,
-        'image': sheep.image,
-        'weight': sheep.weight,
-        'breed': sheep.breed,
-        'mother_id': sheep.mother.tag_id if sheep.mother else None,
-        'father_id': sheep.father.tag_id if sheep.father else None,
-        'is_lamb': sheep.is_lamb
-    } for sheep in sheep_list])
+    # Every write bumps some row's updated_at or the row count; a client
+    # still holding the list gets an empty 304. MAX alone misses updates:
+    # updated_at is stamped by the app before commit, so concurrent writes
+    # (or workers with skewed clocks) can commit an older timestamp than
+    # the current maximum. The sum moves on any row's change. Only two
+    # writes to one row within the same millisecond could still go unseen.
+    last_updated, count, updated_sum = db.session.query(
+        func.max(Sheep.updated_at), func.count(Sheep.id), func.sum(epoch_ms(Sheep.updated_at))
+    ).one()
+    etag = hashlib.sha1(f"{last_updated}:{count}:{updated_sum}".encode()).hexdigest()
+    # Flask-Compress sends the tag out as W/"<sha>:gzip" (or ':br'), and
+    # that is what comes back; compare the part before the suffix
+    client_etags = {tag.partition(':')[0] for tag in request.if_none_match.as_set(include_weak=True)}
+    if request.if_none_match.star_tag or etag in client_etags:
+        resp = make_response('', 304)
+        resp.set_etag(etag, weak=True)
+        return resp
+
+    # Cached under the ETag so a worker can never pair it with a stale body
+    cache_key = f'sheep_list:{etag}'
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = sheep_list_payload()
+        cache.set(cache_key, payload, timeout=30)
+    resp = jsonify(payload)
+    resp.set_etag(etag, weak=True)
+    return resp
+
+def sheep_list_payload():
+    """Serializable rows for GET /sheep"""
+    # Plain column rows with parent tags joined in: no ORM objects to hydrate
+    mother = aliased(Sheep)
+    father = aliased(Sheep)
+    rows = (
+        db.session.query(
+            Sheep.id, Sheep.tag_id, Sheep.dob, Sheep.gender, Sheep.pregnant,
+            Sheep.medical_records, Sheep.image, Sheep.weight, Sheep.breed,
+            mother.tag_id.label('mother_tag'), father.tag_id.label('father_tag'),
+            Sheep.is_lamb
+        )
+        .outerjoin(mother, Sheep.mother_id == mother.id)
+        .outerjoin(father, Sheep.father_id == father.id)
+        .all()
+    )
+    return [{
+        'id': row.id,
+        'tag_id': row.tag_id,
+        'dob': row.dob,
+        'gender': row.gender,
+        'pregnant': row.pregnant,
+        'medical_records': row.medical_records,
+        'image': row.image,
+        'weight': row.weight,
+        'breed': row.breed,
+        'mother_id': row.mother_tag,
+        'father_id': row.father_tag,
+        'is_lamb': row.is_lamb
+    } for row in rows]
 
 # ────────────────────────────────────────────────────────────
-@app.route('/sheep/<int:sheep_id>', methods=['GET'])
+@sheep_bp.route('/sheep/<int:sheep_id>', methods=['GET'])
+@cache.memoize(timeout=60)
 def get_sheep_by_id(sheep_id):
-    sheep = Sheep.query.get_or_404(sheep_id)
+    # Parents via LEFT JOIN, children via one IN query each; only tag_ids are read
+    sheep = Sheep.query.options(
+        joinedload(Sheep.mother).load_only(Sheep.tag_id),
+        joinedload(Sheep.father).load_only(Sheep.tag_id),
+        selectinload(Sheep.mother_children).load_only(Sheep.tag_id),
+        selectinload(Sheep.father_children).load_only(Sheep.tag_id)
+    ).get_or_404(sheep_id)
     return jsonify({
         "tag_id": sheep.tag_id,
         "dob": sheep.dob.isoformat() if sheep.dob else None,
@@ -118,15 +272,29 @@ def get_sheep_by_id(sheep_id):
     })
 
 # ────────────────────────────────────────────────────────────
-@app.route('/sheep/by_tag/<string:tag_id>', methods=['GET'])
+@sheep_bp.route('/sheep/by_tag/<string:tag_id>', methods=['GET'])
+@cache.memoize(timeout=60)
 def get_sheep_by_tag_id(tag_id):
-    sheep = Sheep.query.filter_by(tag_id=tag_id).first()
+    # One SELECT with the parent tags joined in instead of two lazy loads
+    mother = aliased(Sheep)
+    father = aliased(Sheep)
+    sheep = (
+        db.session.query(
+            Sheep.id, Sheep.tag_id, Sheep.dob, Sheep.gender, Sheep.image,
+            Sheep.pregnant, Sheep.weight, Sheep.breed, Sheep.medical_records,
+            Sheep.is_lamb, mother.tag_id.label('mother_tag'), father.tag_id.label('father_tag')
+        )
+        .outerjoin(mother, Sheep.mother_id == mother.id)
+        .outerjoin(father, Sheep.father_id == father.id)
+        .filter(Sheep.tag_id == tag_id)
+        .first()
+    )
     if not sheep:
         return jsonify({'error': 'Sheep not found'}), 404
     return jsonify({
         "id": sheep.id,
         "tag_id": sheep.tag_id,
-        "dob": sheep.dob.isoformat() if sheep.dob else None,
+        "dob": sheep.dob,
         "gender": sheep.gender,
         "image": sheep.image,
         "pregnant": sheep.pregnant,
@@ -134,12 +302,12 @@ def get_sheep_by_tag_id(tag_id):
         "breed": sheep.breed,
         "medical_records": sheep.medical_records,
         "is_lamb": sheep.is_lamb,
-        "mother_id": sheep.mother.tag_id if sheep.mother else None,
-        "father_id": sheep.father.tag_id if sheep.father else None,
+        "mother_id": sheep.mother_tag,
+        "father_id": sheep.father_tag,
     })
 
 # ────────────────────────────────────────────────────────────
-@app.route('/sheep/<int:sheep_id>', methods=['PUT'])
+@sheep_bp.route('/sheep/<int:sheep_id>', methods=['PUT'])
 def update_sheep(sheep_id):
     sheep = Sheep.query.get_or_404(sheep_id)
 
@@ -147,13 +315,12 @@ def update_sheep(sheep_id):
         return jsonify({"error": "Content-Type must be application/json"}), 415
 
     data = request.get_json()
-    print("🔄 Updating Sheep ID:", sheep_id)
-    print("📝 Incoming JSON data:", data)
+    current_app.logger.debug("Updating sheep %s with data: %s", sheep_id, data)
 
     try:
         sheep.tag_id = data['tag_id']
         sheep.gender = data['gender']
-        sheep.dob = parse_date(data['dob']).date()  # UPDATED
+        sheep.dob = parse_dob(data['dob'])
         sheep.pregnant = (
             bool(data.get('pregnant')) if sheep.gender.lower() == 'female' else None
         )  # FIXED
@@ -162,8 +329,7 @@ def update_sheep(sheep_id):
         sheep.medical_records = data.get('medical_records')
 
         try:
-            sheep.mother_id = get_parent_id(data['mother_id']) if data.get('mother_id') else None
-            sheep.father_id = get_parent_id(data['father_id']) if data.get('father_id') else None
+            sheep.mother_id, sheep.father_id = resolve_parents(data.get('mother_id'), data.get('father_id'))
         except ValueError as e:
             return jsonify({"error": str(e)}), 404
 
@@ -174,6 +340,7 @@ def update_sheep(sheep_id):
             sheep.image = image_url
 
         db.session.commit()
+        cache.clear()
         return jsonify({'message': 'Sheep updated successfully'})
 
     except Exception as e:
@@ -181,28 +348,41 @@ def update_sheep(sheep_id):
         return jsonify({'error': str(e)}), 500
 
 # ────────────────────────────────────────────────────────────
-@app.route('/sheep/<int:sheep_id>', methods=['DELETE'])
+@sheep_bp.route('/sheep/<int:sheep_id>', methods=['DELETE'])
 def delete_sheep(sheep_id):
-    sheep = Sheep.query.get_or_404(sheep_id)
-    db.session.delete(sheep)
+    # Detach offspring (as the ORM delete cascade did), then delete by id
+    # without loading the row
+    db.session.execute(update(Sheep).where(Sheep.mother_id == sheep_id).values(mother_id=None))
+    db.session.execute(update(Sheep).where(Sheep.father_id == sheep_id).values(father_id=None))
+    tag_id = db.session.execute(
+        delete(Sheep).where(Sheep.id == sheep_id).returning(Sheep.tag_id)
+    ).scalar_one_or_none()
+    if tag_id is None:
+        db.session.rollback()
+        abort(404)
+
     db.session.commit()
-    return jsonify({"message": f"Sheep {sheep.tag_id} deleted"})
+    cache.clear()
+    return jsonify({"message": f"Sheep {tag_id} deleted"})
 
 # ────────────────────────────────────────────────────────────
-@app.errorhandler(404)
+@sheep_bp.app_errorhandler(404)
 def resource_not_found(e):
     return jsonify({"error": "Resource not found"}), 404
 
-@app.route('/sheep/offspring/<string:tag_id>', methods=['GET'])
+@sheep_bp.route('/sheep/offspring/<string:tag_id>', methods=['GET'])
 def get_offspring_by_tag(tag_id):
-    parent = Sheep.query.filter_by(tag_id=tag_id).first()
+    # Children and both of their parents in a fixed number of queries, not one per child
+    child_parents = (selectinload(Sheep.mother), selectinload(Sheep.father))
+    parent = Sheep.query.options(
+        selectinload(Sheep.mother_children).options(*child_parents),
+        selectinload(Sheep.father_children).options(*child_parents)
+    ).filter_by(tag_id=tag_id).first()
     if not parent:
         return jsonify({"error": "Parent sheep not found"}), 404
 
     sheep_children = parent.mother_children + parent.father_children
-    lamb_children = Lamb.query.filter(
-        (Lamb.mother_tag_id == tag_id) | (Lamb.father_tag_id == tag_id)
-    ).all()
+    lamb_children = [child for child in sheep_children if child.is_lamb]
 
     return jsonify({
         "sheep_children": [{
@@ -0,0 +1,32 @@
+"""Add lower(tag_id) and partial is_lamb indexes to sheep table
+
+Revision ID: 833f08a99e93
+Revises: b8d8797146bb
+Create Date: 2026-10-15 09:12:04.118532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '833f08a99e93'
+down_revision = 'b8d8797146bb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('sheep', schema=None) as batch_op:
+        batch_op.create_index('ix_sheep_lower_tag_id', [sa.text('lower(tag_id)')], unique=True)
+        batch_op.create_index(
+            'ix_sheep_is_lamb', ['is_lamb'],
+            postgresql_where=sa.text('is_lamb = true'),
+            sqlite_where=sa.text('is_lamb = 1')
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('sheep', schema=None) as batch_op:
+        batch_op.drop_index('ix_sheep_is_lamb')
+        batch_op.drop_index('ix_sheep_lower_tag_id')